@@ -4,100 +4,247 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import argparse
+import concurrent.futures
+import functools
 import hashlib
+import hmac
+import http.client
 import json
+import mmap
 import os
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
 
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import IO, Any, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import orjson               # type: ignore[import-not-found,unused-ignore]
+except ImportError:
+    orjson = None               # type: ignore[assignment,unused-ignore]
+
+try:
+    import stream_unzip         # type: ignore[import-untyped,import-not-found,unused-ignore]
+except ImportError:
+    stream_unzip = None         # type: ignore[assignment,unused-ignore]
+
+try:
+    import urllib3              # type: ignore[import-not-found,unused-ignore]
+except ImportError:
+    urllib3 = None              # type: ignore[assignment,unused-ignore]
 
 GRADLE_VERSIONS_ALL_URL = "https://services.gradle.org/versions/all"
-GRADLE_BINZIP_URL = "https://services.gradle.org/distributions/gradle-{}-bin.zip"
-GRADLE_SHA256_URL = "https://services.gradle.org/distributions/gradle-{}-bin.zip.sha256"
-GRADLE_BINZIP_RX = re.compile(r"https://services\.gradle\.org/distributions/gradle-(.*)-bin.zip")
+GRADLE_DIST_URL_PREFIX = "https://services.gradle.org/distributions/gradle-"
+GRADLE_BINZIP_SUFFIX = "-bin.zip"
+
+TRUSTED_TLS_HOSTS = ("services.gradle.org",)
+
+_FETCH_ERRORS: Tuple[Any, ...] = (urllib.error.URLError,)
+if urllib3 is not None:
+    _FETCH_ERRORS += (urllib3.exceptions.HTTPError,)
 
 DISTDIR = os.environ.get("GRADLEW_PY_DISTDIR") or str(Path.home() / ".gradlewpy")
 
+READ_CHUNK_SIZE = 1 << 20
+MMAP_THRESHOLD = 16 << 20
+
 
 class Error(Exception):
     """Error."""
 
 
+class GradleVersions(NamedTuple):
+    """Parsed gradle-versions.json, projected into per-field lookups."""
+    versions: FrozenSet[str]
+    binzip_urls: Dict[str, str]
+    sha256s: Dict[str, str]
+    sizes: Dict[str, Optional[int]]
+
+
 def gradlew(*args: str, distdir: str, version: Optional[str] = None,
-            verbose: bool = False) -> None:
+            trust_tls: bool = False, verbose: bool = False) -> None:
     """Gradle wrapper."""
-    gradle_versions = load_gradle_versions()
     wrapper_binzip_url = wrapper_sha256 = None
     if not version:
         if not os.path.exists(_wrapper_props()):
             raise Error(f"No such file: {_wrapper_props()!r}")
         wrapper_binzip_url, wrapper_sha256 = load_wrapper_urls()
-        if not (m := GRADLE_BINZIP_RX.fullmatch(wrapper_binzip_url)):
+        prefix_ok = wrapper_binzip_url.startswith(GRADLE_DIST_URL_PREFIX)
+        suffix_ok = wrapper_binzip_url.endswith(GRADLE_BINZIP_SUFFIX)
+        if not (prefix_ok and suffix_ok):
             raise Error(f"Unsupported URL: {wrapper_binzip_url!r}")
-        version = m[1]
-    if version not in gradle_versions:
-        raise Error(f"Unknown gradle version: {version!r}")
-    binzip_url = gradle_versions[version]["binzip_url"]
-    sha256 = gradle_versions[version]["sha256"]
-    if wrapper_binzip_url and binzip_url != wrapper_binzip_url:
-        raise Error(f"URL mismatch: expected {binzip_url!r}, .properties has {wrapper_binzip_url!r}")
-    if wrapper_sha256 and sha256 != wrapper_sha256:
-        raise Error(f"SHA-256 mismatch: expected {sha256!r}, .properties has {wrapper_sha256!r}")
-    gradle_cmd = download_gradle(distdir, version, binzip_url, sha256, verbose=verbose)
+        version = wrapper_binzip_url[len(GRADLE_DIST_URL_PREFIX):-len(GRADLE_BINZIP_SUFFIX)]
+    gradle_cmd = os.path.join(distdir, f"gradle-{version}", "bin", "gradle")
+    if not os.path.exists(gradle_cmd):
+        # only load & validate against gradle-versions.json on a cache miss:
+        # the steady-state hot path is a single stat() of the installed dist
+        gradle_versions = load_gradle_versions()
+        if version not in gradle_versions.versions:
+            raise Error(f"Unknown gradle version: {version!r}")
+        binzip_url = gradle_versions.binzip_urls[version]
+        sha256 = gradle_versions.sha256s[version]
+        if wrapper_binzip_url and binzip_url != wrapper_binzip_url:
+            raise Error(f"URL mismatch: expected {binzip_url!r}, "
+                        f".properties has {wrapper_binzip_url!r}")
+        if wrapper_sha256 and sha256 != wrapper_sha256:
+            raise Error(f"SHA-256 mismatch: expected {sha256!r}, "
+                        f".properties has {wrapper_sha256!r}")
+        gradle_cmd = download_gradle(distdir, version, binzip_url, sha256,
+                                     size=gradle_versions.sizes[version],
+                                     trust_tls=trust_tls, verbose=verbose)
     run_command(gradle_cmd, *args, verbose=verbose)
 
 
 def download_gradle(distdir: str, version: str, binzip_url: str, sha256: str,
-                    *, verbose: bool = False) -> str:
+                    *, size: Optional[int] = None, trust_tls: bool = False,
+                    verbose: bool = False) -> str:
     """Download gradle."""
     gradle_cmd = os.path.join(distdir, f"gradle-{version}", "bin", "gradle")
     if os.path.exists(gradle_cmd):
         return gradle_cmd
     if verbose:
         print(f"[DOWNLOAD] {binzip_url!r}", file=sys.stderr)
+    verify = not (trust_tls and _trusted_tls_url(binzip_url))
+    if stream_unzip:
+        _stream_download_gradle(distdir, version, binzip_url, sha256,
+                                size=size, verify=verify, verbose=verbose)
+        os.chmod(gradle_cmd, 0o755)
+        return gradle_cmd
     with tempfile.TemporaryDirectory() as tmpdir:
         outfile = os.path.join(tmpdir, "gradle.zip")
-        if shutil.which("wget"):
-            run_command("wget", "-q", "-O", outfile, "--", binzip_url, verbose=verbose)
-            dl_sha256 = sha256_file(outfile)
-        else:
-            dl_sha256 = download_file(binzip_url, outfile)
-        if dl_sha256 != sha256:
-            raise Error(f"SHA-256 mismatch: expected {sha256!r}, actual {dl_sha256!r}")
+        download_file(binzip_url, outfile, expected_sha256=sha256 if verify else None,
+                      expected_size=size)
         Path(distdir).mkdir(exist_ok=True)
-        if shutil.which("unzip"):
-            run_command("unzip", "-q", "-d", distdir, outfile, verbose=verbose)
-        else:
-            if verbose:
-                print(f"[UNZIP] path={distdir!r} {outfile!r}", file=sys.stderr)
-            import zipfile
-            with zipfile.ZipFile(outfile) as zf:
-                zf.extractall(distdir)
-            os.chmod(gradle_cmd, 0o755)
+        _extract_zip(outfile, distdir, verbose=verbose)
     return gradle_cmd
 
 
+def _extract_zip(outfile: str, distdir: str, *, verbose: bool = False) -> None:
+    """Extract .zip using zipfile, parallelized across entries."""
+    if verbose:
+        print(f"[UNZIP] path={distdir!r} {outfile!r}", file=sys.stderr)
+    import zipfile
+
+    def extract(info: "zipfile.ZipInfo") -> None:
+        path = zf.extract(info, distdir)
+        # restore mode bits (like unzip does); zipfile.extract does not
+        if mode := (info.external_attr >> 16) & 0o777:
+            os.chmod(path, mode)
+
+    with zipfile.ZipFile(outfile) as zf:
+        for info in zf.infolist():
+            if info.filename.startswith("/") or ".." in info.filename.split("/"):
+                raise Error(f"Unsafe entry in .zip: {info.filename!r}")
+        files = [info for info in zf.infolist() if not info.is_dir()]
+        # create all directories up front so the worker threads don't race
+        dirs = {info.filename.rstrip("/") for info in zf.infolist() if info.is_dir()}
+        dirs |= {os.path.dirname(info.filename) for info in files}
+        for dirname in sorted(dirs):
+            Path(distdir, dirname).mkdir(parents=True, exist_ok=True)
+        # zlib releases the GIL during inflate, so threads extract in parallel
+        workers = min(8, os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+            for _ in ex.map(extract, files):
+                pass
+
+
+def _trusted_tls_url(url: str) -> bool:
+    parsed = urllib.parse.urlsplit(url)
+    return parsed.scheme == "https" and parsed.hostname in TRUSTED_TLS_HOSTS
+
+
+def _stream_download_gradle(distdir: str, version: str, binzip_url: str, sha256: str,
+                            *, size: Optional[int] = None, verify: bool = True,
+                            attempts: int = 5, verbose: bool = False) -> None:
+    """Download, SHA-256 & extract gradle in a single streaming pass."""
+    Path(distdir).mkdir(exist_ok=True)
+    # extract into a temporary directory first: the data is untrusted until the
+    # SHA-256 matches, so only move it into place after verification
+    tmpdir = tempfile.mkdtemp(dir=distdir, prefix=f".gradle-{version}-")
+    try:
+        sha = hashlib.sha256()
+
+        def chunks() -> Iterator[bytes]:
+            bytes_so_far = 0
+            for attempt in range(attempts):
+                try:
+                    request = urllib.request.Request(binzip_url)
+                    if bytes_so_far:
+                        request.add_header("Range", f"bytes={bytes_so_far}-")
+                    with urllib.request.urlopen(request) as fh:
+                        if bytes_so_far and fh.status != 206:
+                            # the unzipper already consumed data; cannot start over
+                            raise Error(f"Cannot resume download of {binzip_url!r}")
+                        length = fh.headers.get("Content-Length")
+                        if not bytes_so_far:
+                            _check_content_length(length, size)
+                        bytes_before = bytes_so_far
+                        while chunk := fh.read(READ_CHUNK_SIZE):
+                            sha.update(chunk)
+                            bytes_so_far += len(chunk)
+                            yield chunk
+                        if length is not None and bytes_so_far - bytes_before < int(length):
+                            # a dropped connection makes read() return a short body
+                            # instead of raising (see download_file)
+                            raise http.client.IncompleteRead(
+                                b"", int(length) - (bytes_so_far - bytes_before))
+                    return
+                except (urllib.error.URLError, http.client.HTTPException, TimeoutError):
+                    if attempt + 1 == attempts:
+                        raise
+                    time.sleep(min(2 ** attempt, 30))
+
+        try:
+            for name_bytes, _size, data in stream_unzip.stream_unzip(chunks()):
+                name = name_bytes.decode()
+                if name.startswith("/") or ".." in name.split("/"):
+                    raise Error(f"Unsafe entry in .zip: {name!r}")
+                path = os.path.join(tmpdir, name)
+                if name.endswith("/"):
+                    Path(path).mkdir(parents=True, exist_ok=True)
+                    for _chunk in data:
+                        pass
+                else:
+                    Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+                    with open(path, "wb") as fho:
+                        for chunk in data:
+                            fho.write(chunk)
+        except stream_unzip.UnzipError as e:
+            raise Error(f"Failed to extract {binzip_url!r}: {e}") from e
+        dl_sha256 = sha.hexdigest()
+        if verify and not hmac.compare_digest(dl_sha256, sha256):
+            raise Error(f"SHA-256 mismatch: expected {sha256!r}, actual {dl_sha256!r}")
+        target = os.path.join(tmpdir, f"gradle-{version}")
+        if not os.path.isdir(target):
+            raise Error(f"No gradle-{version} directory in .zip")
+        if verbose:
+            print(f"[MOVE] path={distdir!r} gradle-{version}", file=sys.stderr)
+        os.replace(target, os.path.join(distdir, f"gradle-{version}"))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
 def load_wrapper_urls() -> Tuple[str, Optional[str]]:
     """Load gradle-wrapper.properties."""
-    binzip_url, sha256 = None, None
     with open(_wrapper_props(), encoding="utf-8") as fh:
-        for line in (line.rstrip("\n") for line in fh):
-            if line.startswith("distributionUrl="):
-                if binzip_url:
-                    print("Warning: more than one distributionUrl in gradle-wrapper.properties",
-                          file=sys.stderr)
-                binzip_url = line.split("=", 1)[-1].replace("https\\:", "https:", 1)
-            elif line.startswith("distributionSha256Sum="):
-                if sha256:
-                    print("Warning: more than one distributionSha256Sum in gradle-wrapper.properties",
-                          file=sys.stderr)
-                sha256 = line.split("=", 1)[-1]
+        text = fh.read()
+    urls = re.findall(r"^distributionUrl=(.*)$", text, re.M)
+    sums = re.findall(r"^distributionSha256Sum=(.*)$", text, re.M)
+    if len(urls) > 1:
+        print("Warning: more than one distributionUrl in gradle-wrapper.properties",
+              file=sys.stderr)
+    if len(sums) > 1:
+        print("Warning: more than one distributionSha256Sum in gradle-wrapper.properties",
+              file=sys.stderr)
+    binzip_url = urls[-1].replace("https\\:", "https:", 1) if urls else None
+    sha256 = sums[-1] if sums else None
     if not binzip_url:
         raise Error("No distributionUrl in gradle-wrapper.properties")
     if not sha256:
@@ -109,72 +256,205 @@ def _wrapper_props() -> str:
     return os.path.join("gradle", "wrapper", "gradle-wrapper.properties")
 
 
-def load_gradle_versions() -> Dict[Any, Any]:
+def load_gradle_versions() -> GradleVersions:
     r"""
     Load gradle-versions.json.
 
-    >>> load_gradle_versions()["8.10.2"]
-    {'binzip_url': 'https://services.gradle.org/distributions/gradle-8.10.2-bin.zip', 'sha256': '31c55713e40233a8303827ceb42ca48a47267a0ad4bab9177123121e71524c26'}
+    >>> gv = load_gradle_versions()
+    >>> "8.10.2" in gv.versions
+    True
+    >>> gv.binzip_urls["8.10.2"]
+    'https://services.gradle.org/distributions/gradle-8.10.2-bin.zip'
+    >>> gv.sha256s["8.10.2"]
+    '31c55713e40233a8303827ceb42ca48a47267a0ad4bab9177123121e71524c26'
 
     """
-    with open(_gradle_versions_json(), encoding="utf-8") as fh:
-        return json.load(fh)        # type: ignore[no-any-return]
+    path = _gradle_versions_json()
+    return _load_gradle_versions(path, os.stat(path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_gradle_versions(path: str, _mtime_ns: int) -> GradleVersions:
+    data = _json_loads(Path(path).read_bytes())
+    return GradleVersions(
+        versions=frozenset(data),
+        binzip_urls={version: d["binzip_url"] for version, d in data.items()},
+        sha256s={version: d["sha256"] for version, d in data.items()},
+        sizes={version: d.get("size") for version, d in data.items()})
 
 
 def save_gradle_versions(data: Dict[Any, Any]) -> None:
-    """Save gradle-versions.json."""
-    with open(_gradle_versions_json(), "w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2)
-        fh.write("\n")
+    """Save gradle-versions.json (atomically; skipped when unchanged)."""
+    path = _gradle_versions_json()
+    payload = (_json_dumps(data) + "\n").encode()
+    try:
+        if Path(path).read_bytes() == payload:
+            return
+    except FileNotFoundError:
+        pass
+    Path(path + ".tmp").write_bytes(payload)
+    os.replace(path + ".tmp", path)
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Dict[Any, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(  # type: ignore[no-any-return,unused-ignore]
+            data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
 
 
 def update_gradle_versions(*, verbose: bool = False) -> None:
     """Update gradle-versions.json."""
+    versions: List[Tuple[str, str, str]] = []
     with urllib.request.urlopen(GRADLE_VERSIONS_ALL_URL) as fh:
-        data = {}
-        for vsn in json.load(fh):
+        for vsn in _json_loads(fh.read()):
             if vsn["nightly"] or vsn["snapshot"]:
                 continue
             version = vsn["version"]
             binzip_url = vsn["downloadUrl"]
             sha256_url = vsn["checksumUrl"]
-            if GRADLE_BINZIP_URL.format(version) != binzip_url:
+            if binzip_url != GRADLE_DIST_URL_PREFIX + version + GRADLE_BINZIP_SUFFIX:
                 print(f"Warning: skipping bad URL {binzip_url!r}", file=sys.stderr)
                 continue
-            if GRADLE_SHA256_URL.format(version) != sha256_url:
+            if sha256_url != GRADLE_DIST_URL_PREFIX + version + GRADLE_BINZIP_SUFFIX + ".sha256":
                 print(f"Warning: skipping bad URL {sha256_url!r}", file=sys.stderr)
                 continue
-            if version in data:
+            if any(version == v for v, _, _ in versions):
                 raise Error(f"Duplicate version: {version!r}")
-            sha256 = _gradle_sha256(sha256_url)
+            versions.append((version, binzip_url, sha256_url))
+    data: Dict[Any, Any] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as ex:
+        sha256s = ex.map(_gradle_sha256, [sha256_url for _, _, sha256_url in versions])
+        sizes = ex.map(_gradle_size, [binzip_url for _, binzip_url, _ in versions])
+        for (version, binzip_url, _), sha256, size in zip(versions, sha256s, sizes):
             if verbose:
                 print(f"Processed {version!r}.")
             data[version] = {"binzip_url": binzip_url, "sha256": sha256}
-        save_gradle_versions(data)
-
-
-def _gradle_sha256(url: str) -> str:
-    with urllib.request.urlopen(url) as fh:
-        sha256: str = fh.read().decode()
-        if not len(sha256) == 64 and all(c in "0123456789abcdef" for c in sha256):
-            raise Error(f"Malformed SHA-256: {sha256!r}")
-        return sha256
+            if size is not None:
+                data[version]["size"] = size
+    save_gradle_versions(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _urllib3_pool() -> Any:
+    return urllib3.PoolManager(num_pools=1, maxsize=16) if urllib3 is not None else None
+
+
+def _gradle_sha256(url: str, *, attempts: int = 3) -> str:
+    for attempt in range(attempts):
+        try:
+            if (pool := _urllib3_pool()) is not None:
+                response = pool.request("GET", url)
+                if response.status != 200:
+                    raise Error(f"Failed to fetch {url!r} (status {response.status})")
+                sha256: str = response.data.decode()
+            else:
+                with urllib.request.urlopen(url) as fh:
+                    sha256 = fh.read().decode()
+            break
+        except _FETCH_ERRORS:
+            if attempt + 1 == attempts:
+                raise
+            time.sleep(attempt + 1)
+    try:
+        if len(sha256) != 64:
+            raise ValueError(f"bad length: {len(sha256)}")
+        bytes.fromhex(sha256)
+    except ValueError as e:
+        raise Error(f"Malformed SHA-256: {sha256!r}") from e
+    return sha256
+
+
+def _gradle_size(url: str, *, attempts: int = 3) -> Optional[int]:
+    for attempt in range(attempts):
+        try:
+            if (pool := _urllib3_pool()) is not None:
+                response = pool.request("HEAD", url)
+                if response.status != 200:
+                    raise Error(f"Failed to fetch {url!r} (status {response.status})")
+                length: Optional[str] = response.headers.get("Content-Length")
+            else:
+                request = urllib.request.Request(url, method="HEAD")
+                with urllib.request.urlopen(request) as fh:
+                    length = fh.headers.get("Content-Length")
+            return int(length) if length is not None else None
+        except _FETCH_ERRORS:
+            if attempt + 1 == attempts:
+                raise
+            time.sleep(attempt + 1)
+    return None
 
 
 def _gradle_versions_json() -> str:
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), "gradle-versions.json")
 
 
-# FIXME: retry!
-def download_file(url: str, outfile: str) -> str:
-    """Download file and get SHA-256."""
+class _HashingReader:
+    """Wrap a binary file object, hashing (and counting) everything read."""
+
+    def __init__(self, fh: IO[bytes], sha: "hashlib._Hash") -> None:
+        self.fh = fh
+        self.sha = sha
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fh.read(size)
+        self.sha.update(data)
+        self.bytes_read += len(data)
+        return data
+
+
+def download_file(url: str, outfile: str, *, expected_sha256: Optional[str] = None,
+                  expected_size: Optional[int] = None, attempts: int = 5) -> str:
+    """Download file (retrying & resuming on transient failure) and get SHA-256."""
+    sha = hashlib.sha256()
+    bytes_so_far = 0
     with open(outfile, "wb") as fho:
-        with urllib.request.urlopen(url) as fhi:
-            sha = hashlib.sha256()
-            while chunk := fhi.read(4096):
-                fho.write(chunk)
-                sha.update(chunk)
-            return sha.hexdigest()
+        for attempt in range(attempts):
+            try:
+                request = urllib.request.Request(url)
+                if bytes_so_far:
+                    request.add_header("Range", f"bytes={bytes_so_far}-")
+                with urllib.request.urlopen(request) as fhi:
+                    if bytes_so_far and fhi.status != 206:
+                        # server ignored the Range header: start over
+                        fho.seek(0)
+                        fho.truncate()
+                        sha = hashlib.sha256()
+                        bytes_so_far = 0
+                    length = fhi.headers.get("Content-Length")
+                    if not bytes_so_far:
+                        # fail fast, before downloading a file of the wrong size
+                        _check_content_length(length, expected_size)
+                    reader = _HashingReader(fhi, sha)
+                    try:
+                        shutil.copyfileobj(reader, fho, length=READ_CHUNK_SIZE)
+                    finally:
+                        bytes_so_far += reader.bytes_read
+                    if length is not None and reader.bytes_read < int(length):
+                        # a dropped connection makes read() return a short body
+                        # instead of raising; turn that into a retryable failure
+                        raise http.client.IncompleteRead(b"", int(length) - reader.bytes_read)
+                break
+            except (urllib.error.URLError, http.client.HTTPException, TimeoutError):
+                if attempt + 1 == attempts:
+                    raise
+                time.sleep(min(2 ** attempt, 30))
+    dl_sha256 = sha.hexdigest()
+    if expected_sha256 is not None and not hmac.compare_digest(dl_sha256, expected_sha256):
+        raise Error(f"SHA-256 mismatch: expected {expected_sha256!r}, actual {dl_sha256!r}")
+    return dl_sha256
+
+
+def _check_content_length(length: Optional[str], expected_size: Optional[int]) -> None:
+    if length is not None and expected_size is not None and int(length) != expected_size:
+        raise Error(f"Size mismatch: expected {expected_size}, server has {length}")
 
 
 def sha256_file(filename: str) -> str:
@@ -186,9 +466,21 @@ def sha256_file(filename: str) -> str:
 
     """
     with open(filename, "rb") as fh:
+        if os.path.getsize(filename) > MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    return hashlib.sha256(mm).hexdigest()
+            except (ValueError, OSError):
+                pass    # e.g. not enough address space on 32-bit; read chunked
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(fh, "sha256").hexdigest()
         sha = hashlib.sha256()
-        while chunk := fh.read(4096):
-            sha.update(chunk)
+        buf = bytearray(READ_CHUNK_SIZE)
+        view = memoryview(buf)
+        while n := fh.readinto(buf):
+            sha.update(view[:n])
         return sha.hexdigest()
 
 
@@ -205,17 +497,22 @@ def run_command(*args: str, verbose: bool = False) -> None:
 
 
 def main() -> None:
-    usage = "gradlew.py [-h] [--distdir DISTDIR] [--version VERSION] [-v] [GRADLE_ARG ...]"
+    usage = ("gradlew.py [-h] [--distdir DISTDIR] [--version VERSION] [--trust-tls] [-v] "
+             "[GRADLE_ARG ...]")
     parser = argparse.ArgumentParser(description="pure python gradle wrapper", usage=usage)
     parser.add_argument("--distdir", default=DISTDIR,
                         help=f"directory for gradle dists [default: {DISTDIR!r}]")
     parser.add_argument("--version", help="override gradle version")
+    parser.add_argument("--trust-tls", action="store_true",
+                        help="skip SHA-256 verification for downloads over HTTPS from "
+                             "trusted hosts (relies on TLS integrity instead)")
     parser.add_argument("-v", "--verbose", action="store_true")
     args, rest = parser.parse_known_args()
     if rest and rest[0] == "--":
         rest = rest[1:]
     try:
-        gradlew(*rest, distdir=args.distdir, version=args.version, verbose=args.verbose)
+        gradlew(*rest, distdir=args.distdir, version=args.version,
+                trust_tls=args.trust_tls, verbose=args.verbose)
     except Error as e:
         print(f"Error: {e}.", file=sys.stderr)
         sys.exit(1)